@@ -1,10 +1,21 @@
 
+import asyncio
+import aiohttp
+import orjson
 import requests 
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor
+import simdjson
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timezone
 import logging
 import os
+import time
+
+# Maximum number of requests in flight at once, matched by the connection pool size
+CONCURRENCY = 16
+# Maximum page size GitHub allows, to minimize paginated requests
+PER_PAGE = 100
+RATE_LIMIT_URL = 'https://api.github.com/rate_limit'
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -17,18 +28,33 @@ class GithubUser:
         :param username: GitHub username
         """
         self.username = username
-        self.url = f"https://api.github.com/users/{username}/repos"
-        self.profile_url = f"https://github.com/{username}?tab="
+        self.url = f"https://api.github.com/users/{username}/repos?per_page={PER_PAGE}"
+        # Remaining API requests and reset time, as last reported by GitHub's X-RateLimit-* headers
+        self.remaining = None
+        self.reset_time = 0
+        # Shared session so synchronous requests reuse pooled connections
+        self.session = requests.Session()
+        retries = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+        self.session.mount("https://", HTTPAdapter(pool_connections=CONCURRENCY, pool_maxsize=CONCURRENCY, max_retries=retries))
+        # Concurrency bound and in-flight stargazer tasks for the asyncio code paths,
+        # created at the start of each event loop run so they bind to that loop
+        self._semaphore = None
+        self._inflight = {}
 
-    def fetch_url(self, url):
+    def fetch_url(self, url, parse=orjson.loads):
         """
         Helper method to send a GET request to a URL and handle errors.
 
         :param url: The URL to request
-        :return: JSON response if successful, None if an error occurs
+        :param parse: The function used to parse the raw JSON response body
+        :return: A tuple of the JSON response and the response headers if successful, None if an error occurs
         """
         try:
-            response = requests.get(url)
+            response = self.session.get(url)
+            self.update_rate_limit(response.headers)
+            if response.status_code == 403 and 'Retry-After' not in response.headers and url != RATE_LIMIT_URL:
+                # Only query the rate limit endpoint when a request was actually refused
+                self.check_rate_limit()
             # Check if the response contains JSON
             if 'application/json' not in response.headers.get('Content-Type', ''):
                 logging.error(f"Expected JSON, but got {response.headers.get('Content-Type')}")
@@ -36,59 +62,225 @@ class GithubUser:
             if response.status_code != 200:
                 logging.error(f"Error fetching {url}: {response.status_code}")
                 return None
-            return response.json()
+            return parse(response.content), response.headers
         except requests.exceptions.RequestException as e:
             logging.error(f"Request failed for {url}: {e}")
             return None
+        except (orjson.JSONDecodeError, ValueError) as e:
+            logging.error(f"Error parsing JSON from {url}: {e}")
+            return None
  
+    def _client_session(self):
+        """
+        Creates the aiohttp session shared by all requests of one event loop run,
+        with its connection pool sized to the concurrency limit.
+
+        :return: A new aiohttp.ClientSession
+        """
+        connector = aiohttp.TCPConnector(limit=CONCURRENCY, ttl_dns_cache=300)
+        return aiohttp.ClientSession(connector=connector)
+
+    async def _fetch(self, session, url, parse=orjson.loads):
+        """
+        Asynchronous counterpart of fetch_url, bounded by the shared semaphore.
+
+        :param session: The aiohttp.ClientSession to send the request with
+        :param url: The URL to request
+        :param parse: The function used to parse the raw JSON response body
+        :return: A tuple of the JSON response and the response headers if successful, None if an error occurs
+        """
+        # Don't spend requests that GitHub is bound to refuse until the rate limit resets
+        if url != RATE_LIMIT_URL and self.remaining == 0 and time.time() < self.reset_time:
+            logging.warning(f"Rate limit exhausted, skipping {url}")
+            return None
+
+        refused = False
+        async with self._semaphore:
+            try:
+                async with session.get(url) as response:
+                    self.update_rate_limit(response.headers)
+                    refused = response.status == 403 and 'Retry-After' not in response.headers and url != RATE_LIMIT_URL
+                    # Check if the response contains JSON
+                    if 'application/json' not in response.headers.get('Content-Type', ''):
+                        logging.error(f"Expected JSON, but got {response.headers.get('Content-Type')}")
+                    elif response.status != 200:
+                        logging.error(f"Error fetching {url}: {response.status}")
+                    else:
+                        return parse(await response.read()), response.headers
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logging.error(f"Request failed for {url}: {e!r}")
+                return None
+            except (orjson.JSONDecodeError, ValueError) as e:
+                logging.error(f"Error parsing JSON from {url}: {e}")
+                return None
+
+        if refused:
+            # Only query the rate limit endpoint when a request was actually refused,
+            # after releasing the semaphore slot
+            await self._check_rate_limit_async(session)
+        return None
+
+    async def _iter_pages(self, session, url, parse=orjson.loads):
+        """
+        Streams the items of a paginated API endpoint by following the 'Link' header,
+        holding only one page in memory at a time.
+
+        :param session: The aiohttp.ClientSession to send the requests with
+        :param url: The URL of the first page
+        :param parse: The function used to parse each raw page into a list of items
+        :return: An async iterator over the items from all pages
+        """
+        while url:
+            result = await self._fetch(session, url, parse)
+            if not result or not result[0]:
+                break
+            page, headers = result
+            for item in page:
+                yield item
+            url = self.extract_next_page_url(headers)
+
+    async def _get_stargazers(self, session, url):
+        """
+        Asynchronous counterpart of get_stargazers.
+
+        :param session: The aiohttp.ClientSession to send the requests with
+        :param url: The URL of the repository's stargazers API endpoint
+        :return: A list of stargazer usernames
+        """
+        url = f"{url}?per_page={PER_PAGE}"
+        return [login async for login in self._iter_pages(session, url, parse=self.extract_usernames)]
+
+    def _get_or_create_task(self, session, url):
+        """
+        Returns the in-flight stargazer task for a URL, creating one only if none exists,
+        so concurrent callers for the same URL share a single fetch.
+
+        :param session: The aiohttp.ClientSession to send the requests with
+        :param url: The URL of the repository's stargazers API endpoint
+        :return: An asyncio.Task resolving to the list of stargazer usernames
+        """
+        task = self._inflight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._get_stargazers(session, url))
+            self._inflight[url] = task
+        return task
+
+    def extract_usernames(self, content):
+        """
+        Extracts usernames from a raw page of user data. The page is parsed lazily with
+        simdjson, so only the 'login' strings are materialized, not a dict per user.
+
+        :param content: Raw JSON list of user objects
+        :return: A list of usernames
+        """
+        parser = simdjson.Parser()  # One parser per call, so concurrent pages never share one
+        users = parser.parse(content)
+        if not isinstance(users, simdjson.Array):
+            logging.error("User data is not in the expected list format.")
+            return []
+        return [user['login'] for user in users if 'login' in user]
+
+    def extract_next_page_url(self, headers):
+        """
+        Extracts the next page URL from the 'Link' header, if it exists.
+
+        :param headers: The headers of the previous response
+        :return: The next page URL, or None if there is no next page
+        """
+        for link in requests.utils.parse_header_links(headers.get('Link', '')):
+            if link.get('rel') == 'next':
+                return link['url']
+        return None
+
+    def update_rate_limit(self, headers):
+        """
+        Records the remaining request count and reset time GitHub reports on every API response.
+
+        :param headers: The response headers
+        """
+        remaining = headers.get('X-RateLimit-Remaining')
+        if remaining is not None:
+            self.remaining = int(remaining)
+        reset_time = headers.get('X-RateLimit-Reset')
+        if reset_time is not None:
+            self.reset_time = int(reset_time)
+
     def check_rate_limit(self):
         """
         Check GitHub's API rate limit status and log the remaining requests and reset time.
         """
-        rate_limit_url = 'https://api.github.com/rate_limit'
-        rate_limit_info = self.fetch_url(rate_limit_url)
-        if rate_limit_info:
-            remaining = rate_limit_info['resources']['core']['remaining']
-            reset_time_unix = rate_limit_info['resources']['core']['reset']
-            reset_time = datetime.fromtimestamp(reset_time_unix, tz=timezone.utc)
-            reset_delta = reset_time - datetime.now(tz=timezone.utc)
+        result = self.fetch_url(RATE_LIMIT_URL)
+        if result:
+            return self.log_rate_limit(result[0])
+        return 0, None
 
-            hours, remainder = divmod(reset_delta.seconds, 3600)
-            minutes, seconds = divmod(remainder, 60)
-            
-            logging.info(f"Remaining requests: {remaining}")
-            logging.info(f"Reset time: {reset_time} UTC ({hours} hours, {minutes} minutes, and {seconds} seconds from now)\n")
-            
-            return remaining, reset_time_unix, hours, minutes, seconds
+    async def _check_rate_limit_async(self, session):
+        """
+        Asynchronous counterpart of check_rate_limit.
+
+        :param session: The aiohttp.ClientSession to send the request with
+        """
+        result = await self._fetch(session, RATE_LIMIT_URL)
+        if result:
+            return self.log_rate_limit(result[0])
         return 0, None
 
-    def get_repositories(self):
+    def log_rate_limit(self, rate_limit_info):
+        """
+        Log the remaining requests and reset time from a rate limit endpoint response.
+
+        :param rate_limit_info: The JSON response of the rate limit endpoint
+        """
+        remaining = rate_limit_info['resources']['core']['remaining']
+        reset_time_unix = rate_limit_info['resources']['core']['reset']
+        self.remaining = remaining
+        self.reset_time = reset_time_unix
+        reset_time = datetime.fromtimestamp(reset_time_unix, tz=timezone.utc)
+        reset_delta = reset_time - datetime.now(tz=timezone.utc)
+
+        hours, remainder = divmod(reset_delta.seconds, 3600)
+        minutes, seconds = divmod(remainder, 60)
+        
+        logging.info(f"Remaining requests: {remaining}")
+        logging.info(f"Reset time: {reset_time} UTC ({hours} hours, {minutes} minutes, and {seconds} seconds from now)\n")
+        
+        return remaining, reset_time_unix, hours, minutes, seconds
+
+    async def get_repositories_async(self):
         """
         Retrieves all repositories of the GitHub user and their star counts.
+        Stargazer pages for every repository are fetched concurrently on a single event loop.
         
         :return: A list of dictionaries containing repository names, star counts, and stargazers
         """
-        repos = self.fetch_url(self.url)
-        if not repos:
-            return []
-        
-        repo_info = []
-        
-        with ThreadPoolExecutor() as executor:
-            # Use executor to fetch stargazers concurrently for all repositories
-            stargazer_futures = {repo['name']: executor.submit(self.get_stargazers, repo['stargazers_url']) for repo in repos}
-            
-            for repo in repos:
-                repo_name = repo['name']
-                stars = repo['stargazers_count']
-                stargazers = stargazer_futures[repo_name].result()  # Get stargazers from the future
-                repo_info.append({
-                    'name': repo_name,
-                    'stars': stars,
-                    'stargazers': stargazers
-                })
+        self._semaphore = asyncio.Semaphore(CONCURRENCY)
+        self._inflight = {}
+        async with self._client_session() as session:
+            repos = [repo async for repo in self._iter_pages(session, self.url)]
+            if not repos:
+                return []
+
+            # Repositories without stars have no stargazer pages worth fetching
+            starred_urls = [repo['stargazers_url'] for repo in repos if repo['stargazers_count']]
+            stargazer_lists = await asyncio.gather(*[self._get_or_create_task(session, url) for url in starred_urls])
+            stargazers_by_url = dict(zip(starred_urls, stargazer_lists))
+
+        return [
+            {
+                'name': repo['name'],
+                'stars': repo['stargazers_count'],
+                'stargazers': stargazers_by_url.get(repo['stargazers_url'], [])
+            }
+            for repo in repos
+        ]
+
+    def get_repositories(self):
+        """
+        Synchronous wrapper around get_repositories_async.
         
-        return repo_info
+        :return: A list of dictionaries containing repository names, star counts, and stargazers
+        """
+        return asyncio.run(self.get_repositories_async())
 
     def get_stargazers(self, url):
         """
@@ -98,43 +290,40 @@ class GithubUser:
         :return: A list of stargazer usernames
         """
         stargazers = []
+        url = f"{url}?per_page={PER_PAGE}"
         while url:
-            stargazer_page = self.fetch_url(url)
-            if not stargazer_page:
+            result = self.fetch_url(url, parse=self.extract_usernames)
+            if not result or not result[0]:
                 break
-            stargazers.extend([user['login'] for user in stargazer_page])
+            logins, headers = result
+            stargazers.extend(logins)
             
             # Check for pagination and get the next page URL from the 'Link' header
-            if 'Link' in requests.head(url).headers:
-                links = requests.head(url).headers['Link']
-                next_page = None
-                for link in links.split(','):
-                    if 'rel="next"' in link:
-                        next_page = link[link.find('<') + 1:link.find('>')]
-                url = next_page
-            else:
-                break
+            url = self.extract_next_page_url(headers)
         
         return stargazers
 
-    def get_users(self, user_type):
+    async def _list_login_set(self, session, endpoint):
         """
-        Scrapes the GitHub profile page to retrieve a list of followers or following.
+        Retrieves the followers or following of the user from the paginated GitHub API.
         
-        :param user_type: 'followers' or 'following' to specify which users to retrieve
+        :param session: The aiohttp.ClientSession to send the requests with
+        :param endpoint: 'followers' or 'following' to specify which users to retrieve
         :return: A set of GitHub usernames
         """
-        try:
-            response = requests.get(self.profile_url + user_type)
-            response.raise_for_status()  # Will raise an HTTPError for bad responses
-            soup = BeautifulSoup(response.text, 'html.parser')
-            return set(elem.text for elem in soup.find_all('span', {'class': 'Link--secondary'}))
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Error fetching {user_type} for {self.username}: {e}")
-            return set()
-        except Exception as e:
-            logging.error(f"Error parsing {user_type} for {self.username}: {e}")
-            return set()
+        url = f"https://api.github.com/users/{self.username}/{endpoint}?per_page={PER_PAGE}"
+        return {login async for login in self._iter_pages(session, url, parse=self.extract_usernames)}
+
+    async def get_follow_lists_async(self):
+        """
+        Fetches the followers and following lists concurrently in one client session.
+        
+        :return: A tuple of the followers and followings sets
+        """
+        self._semaphore = asyncio.Semaphore(CONCURRENCY)
+        async with self._client_session() as session:
+            followers, followings = await asyncio.gather(self._list_login_set(session, 'followers'), self._list_login_set(session, 'following'))
+        return followers, followings
 
     def print_follow_status(self, followers, followings):
         """
@@ -148,10 +337,9 @@ class GithubUser:
     def check_follow_status(self):
         """
         Checks and compares the followers and following lists of the user to determine who is not following back.
-        Uses ThreadPoolExecutor to fetch both lists concurrently.
+        Fetches both lists concurrently on the asyncio event loop.
         """
-        with ThreadPoolExecutor(max_workers=2) as executor:
-            followers, followings = executor.map(self.get_users, ['followers', 'following'])
+        followers, followings = asyncio.run(self.get_follow_lists_async())
         
         self.print_follow_status(followers, followings)
 
@@ -176,10 +364,5 @@ if __name__ == "__main__":
     username = input("\nEnter your GitHub username: ")
     user = GithubUser(username)
     
-    # Check rate limit before proceeding
-    remaining, reset_time, hours, minutes, seconds = user.check_rate_limit()
-    if remaining == 0:
-        logging.warning(f"Rate limit exceeded. Try again in {hours} hours, {minutes} minutes, and {seconds} seconds.")
-    
     user.print_repositories_info()  # To print repository and stargazer info
     user.check_follow_status()  # To check follow status
@@ -1,29 +1,45 @@
+import orjson
 import requests
+import simdjson
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 import time
 import datetime
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor
+import email.utils
+from concurrent.futures import ThreadPoolExecutor, Future
 import logging
-from typing import List, Dict, Tuple, Any, Optional
-import sys
+import shelve
+import threading
+from typing import List, Dict, Tuple, Any, Optional, Iterator, Callable
 
 # Constants for GitHub API URLs and rate limiting
 API_BASE_URL = "https://api.github.com"
 USER_REPOS_URL = f"{API_BASE_URL}/users/{{username}}/repos"
 LINK_HEADER = 'Link'
-REL_NEXT = 'rel="next"'
+REL_NEXT = 'next'
+PER_PAGE = 100  # maximum page size GitHub allows, to minimize paginated requests
 
 # Constants for retry mechanism and exponential backoff
 MAX_RETRIES = 5
 INITIAL_RETRY_DELAY = 1  # initial delay in seconds
 MAX_BACKOFF_TIME = 60  # max backoff time in seconds
+SECONDARY_RATE_LIMIT_WAIT = 60  # GitHub asks for at least a minute when no Retry-After is sent
+
+# Worker threads and pooled connections, kept equal so no thread has to open a new connection
+CONCURRENCY = 16
+
+# On-disk cache of ETag/Last-Modified validators and response bodies for conditional GETs
+CACHE_FILE = ".github_cache"
+CACHE_TTL = 3600  # seconds before a cached response is dropped instead of revalidated
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
 class GithubUser:
-    # Class-level cache for rate limit reset time
+    # Class-level cache for rate limit reset time and remaining requests,
+    # refreshed from the X-RateLimit-* headers of every API response
     cached_reset_time = 0
+    cached_remaining: Optional[int] = None
 
     def __init__(self, username: str):
         """
@@ -32,65 +48,136 @@ class GithubUser:
         :param username: GitHub username to fetch repositories and follow status for.
         """
         self.username = username
-        self.url = USER_REPOS_URL.format(username=username)
-        self.profile_url = f"https://github.com/{username}?tab="
+        self.url = f"{USER_REPOS_URL.format(username=username)}?per_page={PER_PAGE}"
         self.session = requests.Session()  # Use requests.Session to reuse connections
+        self.session.mount("https://", HTTPAdapter(pool_connections=CONCURRENCY, pool_maxsize=CONCURRENCY))
+        # In-flight stargazer futures keyed by URL, so concurrent callers share one fetch
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        # On-disk response cache, opened once; the lock serializes reads and writes across worker threads
+        self._cache = shelve.open(CACHE_FILE)
+        self._cache_lock = threading.Lock()
+        self.prune_cache()
+
+    def __enter__(self) -> "GithubUser":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the on-disk response cache, flushing any pending writes.
+        """
+        with self._cache_lock:
+            self._cache.close()
+
+    def prune_cache(self) -> None:
+        """
+        Removes expired entries from the on-disk response cache so it doesn't grow without bound.
+        """
+        now = time.time()
+        with self._cache_lock:
+            expired = [url for url, entry in self._cache.items() if now - entry.get('fetched_at', 0) >= CACHE_TTL]
+            for url in expired:
+                del self._cache[url]
 
     def handle_rate_limit(self) -> None:
         """
         Manages rate limiting for API requests. 
 
-        If the rate limit is exceeded:
-        - Waits until the cached reset time if known.
-        - Otherwise, updates the cached reset time using the rate limit endpoint.
+        Relies on the state cached from response headers, and if no requests
+        remain, waits until the cached reset time. Before the first response there is
+        nothing to go on, so the request simply proceeds.
+        """
+        if GithubUser.cached_remaining is None:
+            return
 
-        :raises Exception: If fetching rate limit information from the API fails.
+        if GithubUser.cached_remaining > 0 or time.time() >= GithubUser.cached_reset_time:
+            return
+
+        # If no remaining requests, wait until the cached reset time
+        # Convert cached_reset_time to a datetime object
+        reset_time = datetime.datetime.fromtimestamp(GithubUser.cached_reset_time, tz=datetime.timezone.utc)
+
+        logging.warning(f"Rate limit in effect. "
+                        f"Reset time: {reset_time.strftime('%Y-%m-%d %H:%M:%S')} UTC."
+                       )
+        # Sleep once for the whole remaining interval instead of polling
+        self.wait_for_rate_limit_reset(GithubUser.cached_reset_time)
+
+    def refresh_rate_limit(self) -> None:
         """
-        WAIT_INTERVAL = 5 
-        current_time = time.time()
-
-        if current_time < GithubUser.cached_reset_time:
-            # Check if remaining requests are still available
-            rate_limit_info = self.session.get(f"{API_BASE_URL}/rate_limit").json()
-            remaining = rate_limit_info.get('resources', {}).get('core', {}).get('remaining', 0)
-            if remaining > 0:
-                logging.info("Processing...")
-                return
-
-            # If no remaining requests, wait until the cached reset time
-            wait_time = GithubUser.cached_reset_time - current_time
-
-            # Convert cached_reset_time to a datetime object
-            reset_time = datetime.datetime.fromtimestamp(GithubUser.cached_reset_time, tz=datetime.timezone.utc)
-
-            logging.warning(f"Rate limit in effect. "
-                            f"Reset time: {reset_time.strftime('%Y-%m-%d %H:%M:%S')} UTC."
-                           )
-           
-            while wait_time > 0:
-                    hours, remainder = divmod(wait_time, 3600)
-                    minutes, seconds = divmod(remainder, 60)
-                    sys.stdout.write(f"\rWaiting: {int(hours)}h {int(minutes)}m {int(seconds)}s remaining.")
-                    sys.stdout.flush()
-                    time.sleep(WAIT_INTERVAL)
-                    wait_time -= WAIT_INTERVAL
+        Updates the cached rate limit state from the rate limit endpoint.
 
+        :raises Exception: If fetching rate limit information from the API fails.
+        """
+        rate_limit_info = orjson.loads(self.session.get(f"{API_BASE_URL}/rate_limit").content)
+        core_info = rate_limit_info.get('resources', {}).get('core', {})
+        reset_time = core_info.get('reset', None)
+        if reset_time:
+            GithubUser.cached_reset_time = reset_time
+            GithubUser.cached_remaining = core_info.get('remaining', 0)
         else:
-            # Update the reset time from the API
-            rate_limit_info = self.session.get(f"{API_BASE_URL}/rate_limit").json()
-            core_info = rate_limit_info.get('resources', {}).get('core', {})
-            reset_time = core_info.get('reset', None)
-            if reset_time:
-                GithubUser.cached_reset_time = reset_time
-            else:
-                logging.error("Rate limit information missing 'reset' field.")
+            logging.error("Rate limit information missing 'reset' field.")
 
+    def update_rate_limit_from_headers(self, headers: Dict[str, str]) -> None:
+        """
+        Updates the cached rate limit state from the X-RateLimit-* headers GitHub sends on every API response.
 
-    def fetch_url(self, url: str) -> Optional[Tuple[Dict[str, Any], Dict[str, str]]]:
+        :param headers: The response headers.
+        """
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset_time = headers.get('X-RateLimit-Reset')
+        if remaining is not None and reset_time is not None:
+            GithubUser.cached_remaining = int(remaining)
+            GithubUser.cached_reset_time = int(reset_time)
+
+    def get_cached_response(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        Looks up a previously cached response for a URL.
+
+        :param url: The URL the response was fetched from.
+        :return: A dictionary with 'etag', 'last_modified', 'content', 'headers' and 'fetched_at' keys,
+                 or None if not cached or expired.
+        """
+        with self._cache_lock:
+            cached = self._cache.get(url)
+            if cached and time.time() - cached.get('fetched_at', 0) >= CACHE_TTL:
+                del self._cache[url]
+                return None
+            return cached
+
+    def store_cached_response(self, url: str, content: bytes, headers: Dict[str, str]) -> None:
+        """
+        Stores a response in the on-disk cache if it carries an ETag or Last-Modified validator.
+
+        :param url: The URL the response was fetched from.
+        :param content: The raw JSON response body, so each caller can parse it its own way.
+        :param headers: The response headers.
+        """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        entry = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'content': content,
+            # Keep header lookups (e.g. 'Link') case-insensitive when served from the cache
+            'headers': CaseInsensitiveDict(headers),
+            'fetched_at': time.time()
+        }
+        with self._cache_lock:
+            self._cache[url] = entry
+
+    def fetch_url(self, url: str, parse: Callable[[bytes], Any] = orjson.loads) -> Optional[Tuple[Any, Dict[str, str]]]:
         """
         Fetches data from a specified URL, handling rate limits and retries.
+        Sends conditional requests for cached URLs and serves the cached data on 304 Not Modified.
 
         :param url: The URL to fetch data from.
+        :param parse: The function used to parse the raw JSON response body.
         :return: A tuple containing the JSON response data and the response headers, or None if the request fails.
         :raises: None directly. Logs errors and handles retries if requests fail.
         """
@@ -100,23 +187,62 @@ class GithubUser:
                 # Centralized rate limit handling
                 self.handle_rate_limit()
 
-                # Make the request
-                response = self.session.get(url)
+                # Make the request, revalidating any cached copy
+                cached = self.get_cached_response(url)
+                request_headers = {}
+                if cached:
+                    if cached['etag']:
+                        request_headers['If-None-Match'] = cached['etag']
+                    if cached['last_modified']:
+                        request_headers['If-Modified-Since'] = cached['last_modified']
+                response = self.session.get(url, headers=request_headers)
+                self.update_rate_limit_from_headers(response.headers)
+                if response.status_code == 304 and cached:
+                    return parse(cached['content']), cached['headers']
                 if response.status_code == 200:
                     content_type = response.headers.get('Content-Type', '').lower()
                     if 'application/json' not in content_type:
                         logging.error(f"Expected JSON, but got {response.headers.get('Content-Type')}")
                         return None
                     try:
-                        return response.json(), response.headers  # Return both JSON data and headers
-                    except ValueError as e:
+                        data = parse(response.content)
+                    except (orjson.JSONDecodeError, ValueError) as e:
                         logging.error(f"Error parsing JSON from {url}: {e}")
                         return None
+                    self.store_cached_response(url, response.content, response.headers)
+                    return data, response.headers  # Return both JSON data and headers
                 elif response.status_code == 404:
                     logging.error(f"User {self.username} not found.")
                     return None
-                elif response.status_code == 403:  # Rate limit exceeded
-                    self.handle_rate_limit()
+                elif response.status_code in (403, 429):
+                    retry_after = self.parse_retry_after(response.headers.get('Retry-After'))
+                    if retry_after is None and response.status_code == 403:
+                        try:
+                            message = orjson.loads(response.content).get('message', '')
+                        except (orjson.JSONDecodeError, ValueError, AttributeError):
+                            message = ''
+                        if 'rate limit' not in message.lower():  # Forbidden, retrying won't help
+                            logging.error(f"Access forbidden for {url}: {message}")
+                            return None
+                    retries += 1
+                    if retries >= MAX_RETRIES:
+                        logging.error(f"Max retries reached for {url}. Giving up.")
+                        return None
+                    if retry_after is not None:
+                        # Secondary rate limits tell us exactly how long to back off
+                        logging.warning(f"Secondary rate limit hit. Retrying in {retry_after:.0f} seconds...")
+                        time.sleep(retry_after + 0.5)
+                        continue
+                    # Only ask the API if the headers didn't say how many requests remain
+                    if GithubUser.cached_remaining is None:
+                        self.refresh_rate_limit()
+                    if GithubUser.cached_remaining == 0:
+                        # Primary rate limit exceeded, wait for the reset
+                        self.handle_rate_limit()
+                    else:
+                        # Secondary rate limit without Retry-After
+                        logging.warning(f"Secondary rate limit hit. Retrying in {SECONDARY_RATE_LIMIT_WAIT} seconds...")
+                        time.sleep(SECONDARY_RATE_LIMIT_WAIT)
                     continue
                 else:
                     logging.error(f"Error fetching {url}: {response.status_code}")
@@ -132,6 +258,28 @@ class GithubUser:
                 time.sleep(backoff_time)
         return None
 
+    def parse_retry_after(self, value: Optional[str]) -> Optional[float]:
+        """
+        Parses a Retry-After header, which may be either a number of seconds or an HTTP date.
+
+        :param value: The Retry-After header value, if any.
+        :return: The number of seconds to wait, or None if the header is missing or malformed.
+        """
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            logging.warning(f"Ignoring malformed Retry-After header: {value}")
+            return None
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=datetime.timezone.utc)
+        return max(0.0, retry_at.timestamp() - time.time())
+
     def check_rate_limit(self) -> None:
         """
         Ensures compliance with the GitHub API rate limit by invoking the rate limit handler.
@@ -146,47 +294,53 @@ class GithubUser:
 
         :param reset_time: The timestamp when the rate limit will reset
         """
-        wait_time = reset_time - time.time() + 1  # Wait until reset time
+        wait_time = max(0, reset_time - time.time()) + 1  # Wait until reset time
         logging.warning(f"Rate limit exceeded. Waiting for {wait_time:.0f} seconds.")
         time.sleep(wait_time)
 
 
-    def extract_usernames(self, page_data: List[Dict[str, Any]]) -> List[str]:
+    def extract_usernames(self, content: bytes) -> List[str]:
         """
-        Extracts usernames from a list of stargazers or followers data.
+        Extracts usernames from a raw page of stargazers or followers data. The page is parsed
+        lazily with simdjson, so only the 'login' strings are materialized, not a dict per user.
 
-        :param page_data: List of dictionaries containing user data, each dictionary must have a 'login' key.
+        :param content: Raw JSON list of user objects, each object must have a 'login' key.
         :return: List of usernames extracted from the data
         """
+        parser = simdjson.Parser()  # One parser per call, so worker threads never share one
+        users = parser.parse(content)
+        if not isinstance(users, simdjson.Array):
+            logging.error("User data is not in the expected list format.")
+            return []
         usernames = []
-        for user in page_data:
-            if 'login' in user:  # Ensure that 'login' key exists in user data
+        for user in users:
+            try:
                 usernames.append(user['login'])
-            else:
+            except (KeyError, TypeError):
                 logging.warning("Missing 'login' key in stargazer data.")
         return usernames
 
-  
-
-    def handle_pagination(self, url: str, fetch_fn) -> List[Dict[str, Any]]:
+    def iter_pages(self, url: str, parse: Callable[[bytes], Any] = orjson.loads) -> Iterator[Any]:
         """
-        Handles pagination for GitHub API responses. It fetches data from multiple pages if necessary.
+        Streams the items of a paginated GitHub API response, fetching one page at a time,
+        so only a single page is held in memory.
 
         :param url: The initial URL to fetch
-        :param fetch_fn: The function used to fetch data (e.g., fetch_url)
-        :return: A list of data from all pages
+        :param parse: The function used to parse each raw page into a list of items
+        :return: Iterator over the items from all pages
         """
-        all_data = []
         while url:
-            page_data, response_headers = fetch_fn(url)  # Assume fetch_fn returns both data and headers
-            if not page_data:
+            result = self.fetch_url(url, parse)
+            if not result or not result[0]:
+                break
+            page_data, response_headers = result
+            if not isinstance(page_data, list):
+                logging.error(f"Page data from {url} is not in the expected list format.")
                 break
-            all_data.extend(page_data)
+            yield from page_data
 
             # Check for pagination and get the next page URL from the 'Link' header
-            next_url = self.extract_next_page_url_from_response(response_headers)
-            url = next_url
-        return all_data
+            url = self.extract_next_page_url_from_response(response_headers)
 
     def extract_next_page_url_from_response(self, response_headers: dict) -> Optional[str]:
         """
@@ -196,12 +350,9 @@ class GithubUser:
         :param response_headers: The headers from the API response
         :return: The next page URL if found, or None if no pagination is present.
         """
-        if LINK_HEADER in response_headers:
-            links = response_headers[LINK_HEADER]
-            for link in links.split(','):
-                if REL_NEXT in link:
-                    next_page = link[link.find('<') + 1:link.find('>')]
-                    return next_page
+        for link in requests.utils.parse_header_links(response_headers.get(LINK_HEADER, '')):
+            if link.get('rel') == REL_NEXT:
+                return link['url']
         return None
 
     def get_repositories(self) -> List[Dict[str, Any]]:
@@ -212,35 +363,57 @@ class GithubUser:
         :return: A list of dictionaries containing repository 'name' (str), 'stars' (int), and 'stargazers' (List[str])
         :rtype: List[Dict]
         """
-        repos = self.fetch_url(self.url)[0]
-        if not repos:
+        # Handle pagination and fetch all repositories before fanning out
+        all_repos = list(self.iter_pages(self.url))
+        if not all_repos:
             return []
 
         repo_info = []
 
-        with ThreadPoolExecutor() as executor:
-            # Use executor to fetch stargazers concurrently for all repositories
-            stargazer_futures = {repo['name']: executor.submit(self.get_stargazers, repo['stargazers_url']) for repo in repos}
-
-            # Handle pagination and fetch repositories in batches
-            all_repos = self.handle_pagination(self.url, self.fetch_url)
-
-            for repo in all_repos:
-                repo_name = repo['name']
-                stars = repo['stargazers_count']
-                try:
-                    stargazers = stargazer_futures[repo_name].result()  # Get stargazers from the future
-                except Exception as e:
-                    logging.error(f"Error fetching stargazers for {repo_name}: {e}")
-                    stargazers = []  # Default to an empty list if there's an error
-                repo_info.append({
-                    'name': repo_name,
-                    'stars': stars,
-                    'stargazers': stargazers
-                })
+        try:
+            with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+                # Use executor to fetch stargazers concurrently, skipping repositories without stars
+                stargazer_futures = {
+                    repo['name']: self.get_or_submit(executor, repo['stargazers_url']) if repo['stargazers_count'] else None
+                    for repo in all_repos
+                }
+
+                for repo in all_repos:
+                    repo_name = repo['name']
+                    stars = repo['stargazers_count']
+                    future = stargazer_futures[repo_name]
+                    try:
+                        stargazers = future.result() if future else []  # Get stargazers from the future
+                    except Exception as e:
+                        logging.error(f"Error fetching stargazers for {repo_name}: {e}")
+                        stargazers = []  # Default to an empty list if there's an error
+                    repo_info.append({
+                        'name': repo_name,
+                        'stars': stars,
+                        'stargazers': stargazers
+                    })
+        finally:
+            # The dedupe map only lives as long as the fetch; don't keep finished stargazer lists around
+            with self._inflight_lock:
+                self._inflight = {}
 
         return repo_info
 
+    def get_or_submit(self, executor: ThreadPoolExecutor, url: str) -> Future:
+        """
+        Returns the in-flight stargazer future for a URL, submitting a new one only if none exists.
+
+        :param executor: The executor used to fetch stargazers
+        :param url: The URL of the repository's stargazers API endpoint
+        :return: A future resolving to the list of stargazer usernames
+        """
+        with self._inflight_lock:
+            future = self._inflight.get(url)
+            if future is None:
+                future = executor.submit(self.get_stargazers, url)
+                self._inflight[url] = future
+            return future
+
     def get_stargazers(self, url: str) -> List[str]:
         """
         Retrieves the list of stargazers for a given repository, paginated.
@@ -248,33 +421,18 @@ class GithubUser:
         :param url: The URL of the repository's stargazers API endpoint
         :return: A list of stargazer usernames
         """
-        stargazers_page_data = self.handle_pagination(url, self.fetch_url)
-        
-        # Ensure the stargazers page data is in the expected format
-        if not isinstance(stargazers_page_data, list):
-            logging.error("Stargazer data is not in the expected list format.")
-            return []
-        
-        return self.extract_usernames(stargazers_page_data)
+        # Next-page URLs from the 'Link' header keep the per_page parameter
+        return list(self.iter_pages(f"{url}?per_page={PER_PAGE}", parse=self.extract_usernames))
 
-    def get_users(self, user_type: str) -> set:
+    def _list_login_set(self, endpoint: str) -> set:
         """
-        Scrapes the GitHub profile page to retrieve a list of followers or following.
+        Retrieves the followers or following of the user from the paginated GitHub API.
 
-        :param user_type: 'followers' or 'following' to specify which users to retrieve
+        :param endpoint: 'followers' or 'following' to specify which users to retrieve
         :return: A set of GitHub usernames
         """
-        try:
-            response = self.session.get(self.profile_url + user_type)
-            response.raise_for_status()  # Will raise an HTTPError for bad responses
-            soup = BeautifulSoup(response.text, 'html.parser')
-            return set(elem.text for elem in soup.find_all('span', {'class': 'Link--secondary'}))
-        except requests.exceptions.RequestException as e:
-            logging.error(f"Error fetching {user_type} for {self.username}: {e}")
-            return set()
-        except Exception as e:
-            logging.error(f"Error parsing {user_type} for {self.username}: {e}")
-            return set()
+        url = f"{API_BASE_URL}/users/{self.username}/{endpoint}?per_page={PER_PAGE}"
+        return set(self.iter_pages(url, parse=self.extract_usernames))
 
     def get_follow_status(self, followers: set, followings: set) -> Dict[str, set]:
         """
@@ -296,8 +454,8 @@ class GithubUser:
         """
         with ThreadPoolExecutor(max_workers=2) as executor:
             # Explicitly calling the method for 'followers' and 'following'
-            followers_future = executor.submit(self.get_users, 'followers')
-            followings_future = executor.submit(self.get_users, 'following')
+            followers_future = executor.submit(self._list_login_set, 'followers')
+            followings_future = executor.submit(self._list_login_set, 'following')
 
             # Waiting for the results of the futures
             followers = followers_future.result()
@@ -345,8 +503,8 @@ if __name__ == "__main__":
     :param username: GitHub username to fetch follow status and repository info for.
     """
     username: str = input("Enter your GitHub username: ")
-    user = GithubUser(username)
-
-    user.print_repositories_info()  # To print repository and stargazer info
-    follow_status = user.check_follow_status()  # Get follow status data
-    user.print_follow_status(follow_status) 
+    # The context manager closes the response cache even on errors or Ctrl-C
+    with GithubUser(username) as user:
+        user.print_repositories_info()  # To print repository and stargazer info
+        follow_status = user.check_follow_status()  # Get follow status data
+        user.print_follow_status(follow_status) 
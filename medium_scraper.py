@@ -15,8 +15,14 @@ This script demonstrates basic Python web scraping techniques using requests and
 - The author does not endorse or support misuse or violations of platform policies.
 """
 
+import shelve
+import time
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+
+# On-disk cache of author info, keyed by screen name
+CACHE_FILE = ".medium_cache"
+CACHE_TTL = 3600  # seconds before a cached profile is fetched again
 
 class MediumScraper:
     def __init__(self, scraperapi_key):
@@ -25,6 +31,12 @@ class MediumScraper:
         self.api_key = scraperapi_key
 
     def get_author_info(self, screen_name):
+        # Serve recent results from the cache to save ScraperAPI credits and render time
+        with shelve.open(CACHE_FILE) as cache:
+            cached = cache.get(screen_name)
+        if cached and time.time() - cached["fetched_at"] < CACHE_TTL:
+            return cached["author_info"]
+
         # Construct ScraperAPI request URL with JavaScript rendering enabled
         url = f"{self.scraperapi_url}?api_key={self.api_key}&url={self.base_url}/{screen_name}&render=true"
         
@@ -42,21 +54,28 @@ class MediumScraper:
             print(f"Error: Unable to access Medium. Status code: {response.status_code}")
             return None
 
-        soup = BeautifulSoup(response.text, "html.parser")
+        # Only parse the tags we read instead of building the whole DOM
+        only = SoupStrainer(["meta", "h3"])
+        soup = BeautifulSoup(response.content, "lxml", parse_only=only)
         
         # Extract author information
         author_name = soup.find("meta", property="og:title")
         author_bio = soup.find("meta", {"name": "description"})
         
         # Extract list of articles written by the author (titles of articles on their profile page)
-        article_titles = [article.text for article in soup.find_all("h3")]
+        article_titles = [article.text for article in soup.select("h3")]
         
-        return {
+        author_info = {
             "author_name": author_name["content"] if author_name else "Unknown",
             "author_bio": author_bio["content"] if author_bio else "No bio available",
             "article_titles": article_titles
         }
 
+        with shelve.open(CACHE_FILE) as cache:
+            cache[screen_name] = {"fetched_at": time.time(), "author_info": author_info}
+
+        return author_info
+
 if __name__ == "__main__":
     scraperapi_key = input("Enter your ScraperAPI key: ")
     screen_name = input("Enter the Medium username (screen name): ")